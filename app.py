@@ -1,12 +1,45 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+from flask_orjson import OrjsonProvider
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
-import subprocess
+import orjson
+import os
+import tempfile
+import threading
+import uuid
+
+import generate_pages
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 CONTENT_DIR = Path("content")
 
+# SKU list is rebuilt only when content/ mtime changes (file added/removed)
+_SKU_CACHE = {"mtime": -1, "skus": None, "payload": None}
+
+# sku -> (file mtime_ns, serialized product); stale entries are re-read
+_PRODUCT_CACHE = {}
+_PRODUCT_LOCK = threading.Lock()
+
+# saves are rare: one lock around read-modify-write + replace + cache store
+_SAVE_LOCK = threading.Lock()
+
+# one worker = rebuilds never overlap; requests only enqueue and return
+_REBUILD_POOL = ThreadPoolExecutor(max_workers=1)
+_REBUILD_JOBS = {}  # job_id -> Future, oldest first
+_REBUILD_KEEP = 50  # finished jobs kept around for status polling
+_REBUILD_PENDING = {"job_id": None}
+_REBUILD_LOCK = threading.Lock()
+
+_SAVED_BODY = orjson.dumps({"status": "saved"})
+
+
+def json_response(body):
+    """Wrap already-serialized JSON bytes, skipping jsonify's encoder."""
+    return Response(body, mimetype="application/json")
+
+
 # =========================
 # UI
 # =========================
@@ -20,8 +53,15 @@ def index():
 # =========================
 @app.route("/api/skus")
 def list_skus():
-    skus = sorted(p.stem for p in CONTENT_DIR.glob("*.json"))
-    return jsonify(skus)
+    mtime = CONTENT_DIR.stat().st_mtime_ns
+    if _SKU_CACHE["mtime"] != mtime:
+        skus = [e.name[:-5] for e in os.scandir(CONTENT_DIR) if e.name.endswith(".json") and e.is_file()]
+        skus.sort()
+        _SKU_CACHE["skus"] = skus
+        _SKU_CACHE["payload"] = orjson.dumps(skus)
+        _SKU_CACHE["mtime"] = mtime
+
+    return json_response(_SKU_CACHE["payload"])
 
 
 # =========================
@@ -33,7 +73,22 @@ def get_product(sku):
     if not file.exists():
         return jsonify({"error": "SKU not found"}), 404
 
-    return json.loads(file.read_text(encoding="utf-8"))
+    mtime = file.stat().st_mtime_ns
+    etag = f'W/"{mtime:x}"'
+    if request.headers.get("If-None-Match") == etag:
+        return "", 304, {"ETag": etag}
+
+    entry = _PRODUCT_CACHE.get(sku)
+    if entry is None or entry[0] != mtime:
+        entry = (mtime, orjson.dumps(orjson.loads(file.read_bytes())))
+        with _PRODUCT_LOCK:
+            _PRODUCT_CACHE[sku] = entry
+
+    resp = json_response(entry[1])
+    resp.headers["ETag"] = etag
+    # browsers must revalidate, but may reuse the body on 304
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 # =========================
@@ -45,26 +100,39 @@ def save_product(sku):
     if not file.exists():
         return jsonify({"error": "SKU not found"}), 404
 
-    data = request.json
-    product = json.loads(file.read_text(encoding="utf-8"))
-
+    data = request.get_json(cache=False, force=True)
     lang = data["lang"]
 
-    # 🔐 safety: ensure lang exists
-    if lang not in product.get("i18n", {}):
-        product.setdefault("i18n", {})[lang] = {}
+    # concurrent saves of one SKU would otherwise lose edits or cache the
+    # mtime of one save with the body of the other
+    with _SAVE_LOCK:
+        product = orjson.loads(file.read_bytes())
+
+        # 🔐 safety: ensure lang exists
+        block = product.setdefault("i18n", {}).setdefault(lang, {})
+
+        block["description"] = data.get("description", "")
+        block["ingredients"] = data.get("ingredients", "")
+        block["precautions"] = data.get("precautions", "")
+        block["history"] = data.get("history", [])
 
-    product["i18n"][lang]["description"] = data.get("description", "")
-    product["i18n"][lang]["ingredients"] = data.get("ingredients", "")
-    product["i18n"][lang]["precautions"] = data.get("precautions", "")
-    product["i18n"][lang]["history"] = data.get("history", [])
+        # write to a unique temp file and swap it in so readers never see a
+        # partial file
+        fd, tmp = tempfile.mkstemp(dir=CONTENT_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb", buffering=65536) as f:
+                f.write(orjson.dumps(product, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            os.chmod(tmp, file.stat().st_mode)  # mkstemp creates it 0600
+            os.replace(tmp, file)
+        except BaseException:
+            os.unlink(tmp)
+            raise
 
-    file.write_text(
-        json.dumps(product, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+        # keep the next GET warm
+        with _PRODUCT_LOCK:
+            _PRODUCT_CACHE[sku] = (file.stat().st_mtime_ns, orjson.dumps(product))
 
-    return jsonify({"status": "saved"})
+    return json_response(_SAVED_BODY)
 
 
 # =========================
@@ -73,9 +141,71 @@ def save_product(sku):
 @app.route("/api/rebuild/<sku>", methods=["POST"])
 def rebuild_html(sku):
     # пока rebuild всех страниц — для MVP ок
-    subprocess.run(["python", "generate_pages.py"], check=True)
+    with _REBUILD_LOCK:
+        job_id = _REBUILD_PENDING["job_id"]
+        future = _REBUILD_JOBS.get(job_id)
+
+        # a job that has not started yet will pick up this save too
+        if future is None or future.running() or future.done():
+            job_id = uuid.uuid4().hex
+            _REBUILD_JOBS[job_id] = _REBUILD_POOL.submit(generate_pages.main)
+            _REBUILD_PENDING["job_id"] = job_id
+
+            # forget the oldest finished jobs so the dict doesn't grow forever
+            finished = [j for j, f in _REBUILD_JOBS.items() if f.done()]
+            for old in finished[:max(0, len(finished) - _REBUILD_KEEP)]:
+                del _REBUILD_JOBS[old]
+
+    return jsonify({"status": "queued", "job_id": job_id})
+
+
+# =========================
+# API: rebuild job status
+# =========================
+@app.route("/api/rebuild/status/<job_id>")
+def rebuild_status(job_id):
+    future = _REBUILD_JOBS.get(job_id)
+    if future is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if not future.done():
+        return jsonify({"status": "running" if future.running() else "queued"})
+
+    exc = future.exception()
+    if exc is not None:
+        return jsonify({"status": "failed", "error": str(exc)})
+
     return jsonify({"status": "rebuilt"})
 
 
+# =========================
+# STARTUP: warm product cache
+# =========================
+def _load_product(path):
+    # stat before read: if the file changes in between, the entry is just stale
+    try:
+        mtime = path.stat().st_mtime_ns
+        return path.stem, mtime, orjson.dumps(orjson.loads(path.read_bytes()))
+    except (OSError, orjson.JSONDecodeError):
+        # deleted meanwhile or broken JSON: leave it to get_product
+        return None
+
+
+def _warm_cache():
+    paths = list(CONTENT_DIR.glob("*.json"))
+    with ThreadPoolExecutor(max_workers=32) as ex:
+        for loaded in ex.map(_load_product, paths):
+            if loaded is None:
+                continue
+            sku, mtime, payload = loaded
+            with _PRODUCT_LOCK:
+                # never clobber an entry written by a save in the meantime
+                _PRODUCT_CACHE.setdefault(sku, (mtime, payload))
+
+
+# background thread so every worker process (dev server or gunicorn) gets warmed
+threading.Thread(target=_warm_cache, daemon=True).start()
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -1,11 +1,12 @@
-import pandas as pd
+import os
+from openpyxl import Workbook, load_workbook
 from pathlib import Path
 
 BASE_DIR = Path(r"C:\Users\marsf\Documents\GitHub\qr-products")
 EXCEL_FILE = BASE_DIR / "FINAL_QR_PRODUCT_LINKS.xlsx"
 IMAGES_DIR = BASE_DIR / "assets"
 
-IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png"})
 
 # =========================
 # ПРОВЕРКИ
@@ -19,27 +20,32 @@ if not IMAGES_DIR.exists():
 # =========================
 # ЧТЕНИЕ EXCEL
 # =========================
-df = pd.read_excel(EXCEL_FILE, header=3)
-df.columns = df.columns.str.strip()
+# read-only: строки читаются потоком, без загрузки всего листа
+wb = load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+rows = wb.active.iter_rows(min_row=4, values_only=True)
 
-if "SKU" not in df.columns:
-    raise ValueError(f"❌ Колонка SKU не найдена. Есть: {list(df.columns)}")
+columns = [h.strip() if isinstance(h, str) else h for h in next(rows, ())]
+if "SKU" not in columns:
+    raise ValueError(f"❌ Колонка SKU не найдена. Есть: {columns}")
 
-excel_skus = set(
-    df["SKU"]
-    .dropna()
-    .astype(str)
-    .str.strip()
-)
+sku_idx = columns.index("SKU")
+excel_skus = {
+    str(r[sku_idx]).strip()
+    for r in rows
+    if sku_idx < len(r) and r[sku_idx] is not None
+}
+wb.close()
 
 # =========================
 # ЧТЕНИЕ ИЗОБРАЖЕНИЙ
 # =========================
-image_skus = set(
-    f.stem.strip()
-    for f in IMAGES_DIR.iterdir()
-    if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS
-)
+image_skus = set()
+with os.scandir(IMAGES_DIR) as entries:
+    for e in entries:
+        name = e.name
+        dot = name.rfind(".")
+        if dot > 0 and name[dot:].lower() in IMAGE_EXTENSIONS and e.is_file():
+            image_skus.add(name[:dot].strip())
 
 # =========================
 # СРАВНЕНИЕ
@@ -57,9 +63,12 @@ print("===================================")
 # =========================
 if missing_images:
     out_file = BASE_DIR / "missing_images.xlsx"
-    pd.DataFrame(
-        {"SKU_without_image": missing_images}
-    ).to_excel(out_file, index=False)
+    report = Workbook(write_only=True)
+    ws = report.create_sheet()
+    ws.append(["SKU_without_image"])
+    for sku in missing_images:
+        ws.append([sku])
+    report.save(out_file)
     print(f"📄 Отчёт сохранён: {out_file}")
 else:
     print("🎉 Все SKU имеют изображения")
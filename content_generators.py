@@ -1,4 +1,5 @@
-from copy import deepcopy
+from string import Formatter
+from types import MappingProxyType
 
 # -----------------------------------
 # SECTION TITLES
@@ -54,6 +55,9 @@ SECTION_TITLES = {
     }
 }
 
+# one read-only dict per language, shared by every generated product
+SECTION_TITLES = {lang: MappingProxyType(d) for lang, d in SECTION_TITLES.items()}
+
 # -----------------------------------
 # TEXT TEMPLATES
 # -----------------------------------
@@ -90,6 +94,54 @@ TEXT = {
     }
 }
 
+# -----------------------------------
+# PRECOMPILED TEMPLATES
+# -----------------------------------
+def compile_template(template, argnames=None):
+    """
+    Parse a str.format template once; the returned callable only concatenates.
+    With argnames it takes those fields positionally, in that order.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        # render() only concatenates str(value); refuse what it would silently drop
+        if spec or conversion:
+            raise ValueError(f"format spec/conversion not supported in template field {field!r}: {template!r}")
+        parts.append((literal, field))
+
+    if argnames is not None:
+        index = {name: i for i, name in enumerate(argnames)}
+        slots = [(literal, index[field] if field is not None else None) for literal, field in parts]
+
+        def render_positional(*args):
+            return "".join([
+                literal + str(args[i]) if i is not None else literal
+                for literal, i in slots
+            ])
+        return render_positional
+
+    def render(**values):
+        return "".join([
+            literal + str(values[field]) if field is not None else literal
+            for literal, field in parts
+        ])
+    return render
+
+
+_SUPPORTED_LANGS = ("ru", "ua", "de", "es", "it", "hr", "hu")
+_EN_SECTIONS = SECTION_TITLES["en"]
+
+# languages without their own TEXT fall back to EN, resolved once here
+_TEXT_FALLBACK = {lang: TEXT.get(lang, TEXT["en"]) for lang in ("en",) + _SUPPORTED_LANGS}
+_EN_TEXT = _TEXT_FALLBACK["en"]
+
+DESC_FMT = {lang: compile_template(t["description"]) for lang, t in _TEXT_FALLBACK.items()}
+HISTORY_FMT = {
+    lang: [(y, compile_template(t)) for y, t in v["history"]]
+    for lang, v in _TEXT_FALLBACK.items()
+}
+
+
 # -----------------------------------
 # EN = SOURCE OF TRUTH
 # -----------------------------------
@@ -100,13 +152,13 @@ def generate_en_content(product, en_block):
 
     en_block.update({
         "title": title,
-        "sections": SECTION_TITLES["en"],
-        "description": TEXT["en"]["description"].format(title=title, country=country),
-        "ingredients": TEXT["en"]["ingredients"],
-        "precautions": TEXT["en"]["precautions"],
+        "sections": _EN_SECTIONS,
+        "description": DESC_FMT["en"](title=title, country=country),
+        "ingredients": _EN_TEXT["ingredients"],
+        "precautions": _EN_TEXT["precautions"],
         "history": [
-            {"year": y, "text": t.format(brand=brand, country=country)}
-            for y, t in TEXT["en"]["history"]
+            {"year": y, "text": fmt(brand=brand, country=country)}
+            for y, fmt in HISTORY_FMT["en"]
         ]
     })
     return en_block
@@ -121,18 +173,21 @@ def generate_i18n_from_en(data):
     country = data.get("country_of_origin", "")
     title = en["title"]
 
-    for lang in ["ru", "ua", "de", "es", "it", "hr", "hu"]:
-        block = deepcopy(en)
+    sections, texts, desc_fmt, history_fmt = SECTION_TITLES, _TEXT_FALLBACK, DESC_FMT, HISTORY_FMT
+
+    for lang in _SUPPORTED_LANGS:
+        # shallow copy: every field below is replaced, extra EN keys (meta) are read-only
+        block = dict(en)
         block["title"] = title
-        block["sections"] = SECTION_TITLES[lang]
+        block["sections"] = sections[lang]
 
-        base = TEXT.get(lang, TEXT["en"])
-        block["description"] = base["description"].format(title=title, country=country)
+        base = texts[lang]
+        block["description"] = desc_fmt[lang](title=title, country=country)
         block["ingredients"] = base["ingredients"]
         block["precautions"] = base["precautions"]
         block["history"] = [
-            {"year": y, "text": t.format(brand=brand, country=country)}
-            for y, t in base["history"]
+            {"year": y, "text": fmt(brand=brand, country=country)}
+            for y, fmt in history_fmt[lang]
         ]
 
         data["i18n"][lang] = block
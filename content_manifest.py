@@ -0,0 +1,48 @@
+import hashlib
+import os
+
+import orjson
+
+
+def rules_fingerprint(*rules) -> str:
+    """
+    Hash of the rule constants a pass applies; stored with its manifest.
+    """
+    return hashlib.sha1(orjson.dumps(rules)).hexdigest()
+
+
+def load_manifest(path, rules: str, force: bool = False) -> dict:
+    """
+    name -> [mtime_ns, size] of content files as they were left by the last run.
+
+    Empty (= every file counts as changed) with force, or when the rules
+    fingerprint differs from the one the manifest was written with.
+    """
+    if force:
+        return {}
+    try:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("rules") != rules:
+        return {}
+    return data.get("files", {})
+
+
+def save_manifest(path, manifest: dict, rules: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps({"rules": rules, "files": manifest}))
+    os.replace(tmp, path)
+
+
+def file_stamp(path) -> list:
+    # list, not tuple: compares equal to what comes back from the JSON file
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def entry_stamp(entry: os.DirEntry) -> list:
+    st = entry.stat()
+    return [st.st_mtime_ns, st.st_size]
@@ -9,7 +9,7 @@ Inputs:
 Outputs:
   - products_enriched.json  (dict keyed by sku_id)
   - products_enriched.ndjson (one json per line; handy for streaming)
-  - cache/ (search + html extraction cache)
+  - cache/web.db (search + html extraction cache, SQLite)
 
 How it works:
   1) Build search queries per SKU (brand + sku name + keywords)
@@ -30,26 +30,42 @@ import json
 import time
 import random
 import hashlib
+import zlib
+import sqlite3
 import argparse
-from dataclasses import dataclass, asdict
+import threading
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 
+import orjson
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tqdm import tqdm
 from rapidfuzz import fuzz
 
 from duckduckgo_search import DDGS
 import trafilatura
+from trafilatura.utils import load_html
+
+from excel_cache import read_excel_cached
 
 # ----------------------------
 # CONFIG
 # ----------------------------
 DEFAULT_TIMEOUT = 25
 MAX_URLS_PER_SKU = 5
+SEARCH_RESULTS = 6        # DDG results requested per query
 MAX_FETCH_CHARS = 40_000  # limit extracted text stored/processed
+MAX_HTML_BYTES = 2_000_000  # skip/truncate raw pages beyond this size
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
 WORKERS = 10              # thread pool size
+PER_HOST_LIMIT = 2        # max concurrent requests to any one host
 SLEEP_BETWEEN_REQUESTS = (0.2, 0.8)  # polite jitter
 
 USER_AGENT = (
@@ -76,6 +92,18 @@ def ensure_dir(p: str) -> None:
 def sha1(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8", errors="ignore")).hexdigest()
 
+@lru_cache(maxsize=100_000)
+def cache_key(s: str) -> str:
+    # Same query/URL is keyed several times per SKU (load, save, legacy lookup).
+    # Stays sha1: web.db rows and the old cache/* file names are keyed by it.
+    return sha1(s)
+
+def pick(bucket: List[str], seed: str) -> str:
+    """
+    Stable choice from a phrase bank: same seed -> same phrase on every run.
+    """
+    return bucket[zlib.crc32(seed.encode("utf-8", errors="ignore")) % len(bucket)]
+
 def clean_spaces(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip())
 
@@ -132,6 +160,38 @@ def is_alcohol(category: str, name: str) -> bool:
         return True
     return False
 
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+def host_slot(host: str) -> threading.BoundedSemaphore:
+    """
+    Per-host semaphore so parallel workers stay polite to any single site.
+    """
+    host = host.lower()
+    with _host_slots_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+    return slot
+
+def make_session() -> requests.Session:
+    """
+    Shared HTTP session: keep-alive + pooled connections, so repeat hosts skip
+    the TCP/TLS handshake. Thread-safe enough for our GET-only use.
+    """
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=WORKERS,
+        pool_maxsize=WORKERS * 2,
+        max_retries=Retry(total=2, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+SESSION = make_session()
+
 # ----------------------------
 # WEB SEARCH + FETCH (with cache)
 # ----------------------------
@@ -142,46 +202,108 @@ class WebDoc:
     text: str
 
 class WebCache:
+    """
+    Search results + extracted pages in one SQLite file (WAL mode) instead of
+    one small JSON file per key. The old per-file cache/search and cache/pages
+    entries are still read on a miss and copied into the database.
+    """
     def __init__(self, base_dir: str = "cache"):
         self.base_dir = base_dir
         self.search_dir = os.path.join(base_dir, "search")
         self.page_dir = os.path.join(base_dir, "pages")
-        ensure_dir(self.search_dir)
-        ensure_dir(self.page_dir)
-
-    def load_search(self, key: str) -> Optional[List[Dict]]:
-        fp = os.path.join(self.search_dir, f"{sha1(key)}.json")
+        ensure_dir(base_dir)
+
+        # one connection shared by the worker threads; the lock serializes access
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            os.path.join(base_dir, "web.db"), check_same_thread=False, isolation_level=None
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS search (k TEXT PRIMARY KEY, query TEXT, results TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS pages (k TEXT PRIMARY KEY, url TEXT, title TEXT, text TEXT)")
+
+    def _load_legacy(self, folder: str, k: str) -> Optional[object]:
+        fp = os.path.join(folder, f"{k}.json")
         if os.path.exists(fp):
             with open(fp, "r", encoding="utf-8") as f:
                 return json.load(f)
         return None
 
+    def load_search(self, key: str) -> Optional[List[Dict]]:
+        k = cache_key(key)
+        with self._lock:
+            row = self.conn.execute("SELECT results FROM search WHERE k = ?", (k,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        legacy = self._load_legacy(self.search_dir, k)
+        if legacy is not None:
+            self.save_search(key, legacy)
+        return legacy
+
     def save_search(self, key: str, results: List[Dict]) -> None:
-        fp = os.path.join(self.search_dir, f"{sha1(key)}.json")
-        with open(fp, "w", encoding="utf-8") as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search (k, query, results) VALUES (?, ?, ?)",
+                (cache_key(key), key, json.dumps(results, ensure_ascii=False)),
+            )
 
     def load_page(self, url: str) -> Optional[WebDoc]:
-        fp = os.path.join(self.page_dir, f"{sha1(url)}.json")
-        if os.path.exists(fp):
-            with open(fp, "r", encoding="utf-8") as f:
-                d = json.load(f)
-            return WebDoc(**d)
+        k = cache_key(url)
+        with self._lock:
+            row = self.conn.execute("SELECT url, title, text FROM pages WHERE k = ?", (k,)).fetchone()
+        if row is not None:
+            return WebDoc(*row)
+        legacy = self._load_legacy(self.page_dir, k)
+        if legacy is not None:
+            doc = WebDoc(**legacy)
+            self.save_page(doc)
+            return doc
         return None
 
     def save_page(self, doc: WebDoc) -> None:
-        fp = os.path.join(self.page_dir, f"{sha1(doc.url)}.json")
-        with open(fp, "w", encoding="utf-8") as f:
-            json.dump(asdict(doc), f, ensure_ascii=False, indent=2)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (k, url, title, text) VALUES (?, ?, ?, ?)",
+                (cache_key(doc.url), doc.url, doc.title, doc.text),
+            )
+
+# query -> Event of the search already running for it (request coalescing)
+_INFLIGHT: Dict[str, threading.Event] = {}
+_INFLIGHT_LOCK = threading.Lock()
 
 def ddg_search(query: str, max_results: int, cache: WebCache) -> List[Dict]:
     cached = cache.load_search(query)
     if cached is not None:
         return cached
 
+    # Another worker missed the cache for the same query: wait for its result
+    # instead of sending a duplicate request to DDG.
+    with _INFLIGHT_LOCK:
+        ev = _INFLIGHT.get(query)
+        owner = ev is None
+        if owner:
+            ev = _INFLIGHT[query] = threading.Event()
+    if not owner:
+        ev.wait()
+        cached = cache.load_search(query)
+        return cached if cached is not None else []
+
+    try:
+        # the previous owner may have finished between our miss and the lock
+        cached = cache.load_search(query)
+        if cached is not None:
+            return cached
+        return _ddg_search_uncached(query, max_results, cache)
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[query]
+        ev.set()
+
+def _ddg_search_uncached(query: str, max_results: int, cache: WebCache) -> List[Dict]:
     results: List[Dict] = []
     try:
-        with DDGS() as ddgs:
+        with host_slot("duckduckgo.com"), DDGS() as ddgs:
             for r in ddgs.text(query, max_results=max_results):
                 # r: {'title','href','body'}
                 results.append({
@@ -189,40 +311,76 @@ def ddg_search(query: str, max_results: int, cache: WebCache) -> List[Dict]:
                     "url": r.get("href", ""),
                     "snippet": r.get("body", ""),
                 })
-    except Exception as e:
-        # Save empty to avoid repeated failures
-        results = []
+    except Exception:
+        # Not cached: rate limits/timeouts are transient, the next run retries
+        return []
     cache.save_search(query, results)
     return results
 
-def fetch_and_extract(url: str, cache: WebCache) -> Optional[WebDoc]:
+def extract_page(html: bytes) -> Optional[Tuple[str, str]]:
+    """
+    CPU-bound part of a fetch: HTML -> (title, text). Top-level and stateless
+    so it can run in a worker process.
+    """
+    # Parse once with lxml for the title and trafilatura
+    tree = load_html(html)
+    if tree is None:
+        return None
+    title = clean_spaces(tree.findtext(".//title") or "")
+    # Use trafilatura for main text extraction (no_fallback skips its slow
+    # secondary extractors; we have our own fallback below)
+    downloaded = trafilatura.extract(
+        tree, include_comments=False, include_tables=False,
+        include_formatting=False, no_fallback=True,
+    )
+    text = clean_spaces(downloaded or "")
+    if not text:
+        # Fallback: whole-page text from a fresh parse (some trafilatura
+        # versions clean the tree they are given in place). Text nodes are
+        # joined with spaces like BeautifulSoup's get_text(" "); text_content()
+        # would glue table cells together ("IngredientsWater, ...").
+        fresh = load_html(html)
+        text = clean_spaces(" ".join(fresh.itertext())) if fresh is not None else ""
+    return title, text[:MAX_FETCH_CHARS]
+
+def fetch_and_extract(url: str, cache: WebCache, parse_pool: Optional[Executor] = None) -> Optional[WebDoc]:
     cached = cache.load_page(url)
     if cached is not None:
         return cached
 
-    headers = {"User-Agent": USER_AGENT}
     try:
-        time.sleep(random.uniform(*SLEEP_BETWEEN_REQUESTS))
-        resp = requests.get(url, headers=headers, timeout=DEFAULT_TIMEOUT)
-        if resp.status_code >= 400:
+        with host_slot(urlparse(url).netloc):
+            time.sleep(random.uniform(*SLEEP_BETWEEN_REQUESTS))
+            # stream: look at the headers before pulling the body
+            with SESSION.get(url, timeout=DEFAULT_TIMEOUT, stream=True) as resp:
+                if resp.status_code >= 400:
+                    return None
+                ctype = resp.headers.get("Content-Type", "").lower()
+                if ctype and not any(t in ctype for t in HTML_CONTENT_TYPES):
+                    return None  # PDF, image, feed, ...
+                if int(resp.headers.get("Content-Length") or 0) > MAX_HTML_BYTES:
+                    return None
+                # no/lying Content-Length: stop reading at the cap anyway
+                chunks, size = [], 0
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= MAX_HTML_BYTES:
+                        break
+        html = b"".join(chunks)
+
+        # Raw bytes: lxml/trafilatura detect the charset from the markup.
+        # Parsing holds the GIL; hand it to the process pool when there is one
+        if parse_pool is not None:
+            page = parse_pool.submit(extract_page, html).result()
+        else:
+            page = extract_page(html)
+        if page is None:
             return None
-        html = resp.text
-        # Use trafilatura for main text extraction
-        downloaded = trafilatura.extract(html, include_comments=False, include_tables=False)
-        text = clean_spaces(downloaded or "")
-        if not text:
-            # Fallback: BeautifulSoup text
-            soup = BeautifulSoup(html, "html.parser")
-            text = clean_spaces(soup.get_text(" "))
-        title = ""
-        try:
-            soup = BeautifulSoup(html, "html.parser")
-            title = clean_spaces(soup.title.get_text()) if soup.title else ""
-        except Exception:
-            title = ""
-
-        text = text[:MAX_FETCH_CHARS]
+
+        title, text = page
         doc = WebDoc(url=url, title=title, text=text)
+        # cache is written here, in the parent, so parse workers stay stateless
         cache.save_page(doc)
         return doc
     except Exception:
@@ -231,6 +389,40 @@ def fetch_and_extract(url: str, cache: WebCache) -> Optional[WebDoc]:
 # ----------------------------
 # FACT EXTRACTION (heuristics)
 # ----------------------------
+# Compiled once at import; these run over merged page text for every SKU
+# (an upper-case INGREDIENTS variant used to be listed too; under IGNORECASE it
+# was the same pattern and only cost an extra full scan on misses)
+INGREDIENT_PATTERNS = [
+    re.compile(r"(Ingredients?\s*[:\-]\s*)(.{20,400})", re.IGNORECASE),
+    re.compile(r"(Состав\s*[:\-]\s*)(.{20,400})", re.IGNORECASE),  # sometimes on bilingual pages
+]
+INGREDIENT_STOP_RE = re.compile(
+    r"(Nutrition|Allergen|Storage|Directions|Contains|May contain|Warning)\b", re.IGNORECASE
+)
+
+# (allergen, alternation) in report order; fused into one regex so the
+# lowercased text is scanned once instead of once per allergen
+ALLERGEN_TERMS = [
+    ("gluten", "gluten"),
+    ("wheat", "wheat"),
+    ("barley", "barley"),
+    ("milk", "milk|dairy"),
+    ("soy", "soy|soya"),
+    ("egg", "egg"),
+    ("peanuts", "peanut"),
+    ("tree nuts", "almond|hazelnut|walnut|cashew|pistachio|pecan"),
+    ("sesame", "sesame"),
+    ("fish", "fish"),
+    ("shellfish", "shellfish|shrimp|crab|lobster"),
+]
+ALLERGEN_RE = re.compile("|".join(
+    rf"\b(?P<a{i}>{alts})\b" for i, (_, alts) in enumerate(ALLERGEN_TERMS)
+))
+
+# matched against lowercased text, so no IGNORECASE needed
+ABV_RE = re.compile(r"(\d{1,2}(?:\.\d{1,2})?)\s*%?\s*abv")
+ALC_RE = re.compile(r"alc(?:ohol)?\s*[:\-]?\s*(\d{1,2}(?:\.\d{1,2})?)\s*%")
+
 def extract_ingredients(text: str) -> Optional[str]:
     """
     Try to capture a clean "Ingredients: ..." line/paragraph.
@@ -240,16 +432,11 @@ def extract_ingredients(text: str) -> Optional[str]:
     t = text
 
     # Common markers
-    patterns = [
-        r"(Ingredients?\s*[:\-]\s*)(.{20,400})",
-        r"(INGREDIENTS?\s*[:\-]\s*)(.{20,400})",
-        r"(Состав\s*[:\-]\s*)(.{20,400})",  # sometimes on bilingual pages
-    ]
-    for pat in patterns:
-        m = re.search(pat, t, flags=re.IGNORECASE)
+    for pat in INGREDIENT_PATTERNS:
+        m = pat.search(t)
         if m:
             blob = m.group(2)
-            blob = re.split(r"(Nutrition|Allergen|Storage|Directions|Contains|May contain|Warning)\b", blob, flags=re.IGNORECASE)[0]
+            blob = INGREDIENT_STOP_RE.split(blob)[0]
             blob = clean_spaces(blob)
             # keep reasonable chars
             blob = blob.strip(" .;")
@@ -257,47 +444,46 @@ def extract_ingredients(text: str) -> Optional[str]:
                 return f"Ingredients: {blob}."
     return None
 
-def extract_allergens(text: str) -> List[str]:
-    if not text:
+def extract_allergens(text_lower: str) -> List[str]:
+    """
+    Expects already-lowercased text.
+    """
+    if not text_lower:
         return []
-    allergens = []
-    # common terms
-    candidates = [
-        ("gluten", r"\b(gluten)\b"),
-        ("wheat", r"\b(wheat)\b"),
-        ("barley", r"\b(barley)\b"),
-        ("milk", r"\b(milk|dairy)\b"),
-        ("soy", r"\b(soy|soya)\b"),
-        ("egg", r"\b(egg)\b"),
-        ("peanuts", r"\b(peanut)\b"),
-        ("tree nuts", r"\b(almond|hazelnut|walnut|cashew|pistachio|pecan)\b"),
-        ("sesame", r"\b(sesame)\b"),
-        ("fish", r"\b(fish)\b"),
-        ("shellfish", r"\b(shellfish|shrimp|crab|lobster)\b"),
-    ]
-    lower = text.lower()
-    for name, pat in candidates:
-        if re.search(pat, lower):
-            allergens.append(name)
-    # de-dup
-    out = []
-    for a in allergens:
-        if a not in out:
-            out.append(a)
-    return out
+    found = set()
+    for m in ALLERGEN_RE.finditer(text_lower):
+        found.add(m.lastgroup)
+        if len(found) == len(ALLERGEN_TERMS):
+            break
+    return [name for i, (name, _) in enumerate(ALLERGEN_TERMS) if f"a{i}" in found]
 
-def extract_abv(text: str) -> Optional[str]:
-    if not text:
+def extract_abv(text_lower: str) -> Optional[str]:
+    """
+    Expects already-lowercased text.
+    """
+    if not text_lower:
         return None
     # ABV patterns
-    m = re.search(r"(\d{1,2}(?:\.\d{1,2})?)\s*%?\s*ABV", text, flags=re.IGNORECASE)
+    m = ABV_RE.search(text_lower)
     if m:
         return f"{m.group(1)}% ABV"
-    m = re.search(r"alc(?:ohol)?\s*[:\-]?\s*(\d{1,2}(?:\.\d{1,2})?)\s*%", text, flags=re.IGNORECASE)
+    m = ALC_RE.search(text_lower)
     if m:
         return f"{m.group(1)}% ABV"
     return None
 
+def extract_facts(text: str, alcohol: bool) -> Tuple[Optional[str], List[str], Optional[str]]:
+    """
+    Run the whole extraction battery over one merged text: (ingredients, allergens, abv).
+    """
+    if not text:
+        return None, [], None
+    # one lowercase pass shared by the case-insensitive extractors;
+    # ingredients keep the original text because the match is returned verbatim
+    text_lower = text.lower()
+    abv = extract_abv(text_lower) if alcohol else None
+    return extract_ingredients(text), extract_allergens(text_lower), abv
+
 def pick_best_docs(docs: List[WebDoc], sku_name: str, brand: str) -> List[WebDoc]:
     """
     Rank docs by basic relevance (title/text contains brand/name tokens).
@@ -326,7 +512,8 @@ def pick_best_docs(docs: List[WebDoc], sku_name: str, brand: str) -> List[WebDoc
 # ----------------------------
 # TEXT GENERATION (consistent style, no hallucinated ingredients)
 # ----------------------------
-def generate_description(category: str, sku_name: str, brand: str, size: str, tags: str, abv: Optional[str]) -> str:
+def generate_description(category: str, sku_name: str, brand: str, size: str, tags: str, abv: Optional[str],
+                         sku_id: str = "") -> str:
     n = sku_name.upper()
     s_hint = size_to_serving_hint(size)
 
@@ -347,8 +534,10 @@ def generate_description(category: str, sku_name: str, brand: str, size: str, ta
         "A convenient choice for quick meals and moments.",
     ]
 
-    op = random.choice(openers)
-    fin = random.choice(finishes)
+    # Seeded by SKU so re-runs produce identical text
+    seed = sku_id or sku_name
+    op = pick(openers, seed)
+    fin = pick(finishes, seed + "|f")
 
     if category == "Water":
         sparkle = "sparkling" if ("SPARKLING" in n or "CARBONATED" in n) else "still"
@@ -432,7 +621,40 @@ def build_queries(brand: str, sku_name: str, category: str) -> List[str]:
             out.append(q)
     return out
 
-def enrich_one(row: Dict, cache: WebCache, max_urls: int = MAX_URLS_PER_SKU) -> Dict:
+INPUT_COLUMNS = ("SKU ID", "Brand", "SKU Name", "Department", "Size", "Tags")
+
+def input_hash(row: Dict) -> str:
+    """
+    Fingerprint of the sheet columns enrich_one reads; unchanged rows can
+    reuse the previous run's output since generation is deterministic.
+    """
+    return sha1("\x1f".join(str(row.get(c, "")) for c in INPUT_COLUMNS))
+
+def prewarm_searches(rows: List[Dict], cache: WebCache) -> None:
+    """
+    Run each distinct "<brand> <name> ingredients" query once, in parallel,
+    before the per-SKU pass. Only the brand+name queries matter here: the
+    brand-only queries from build_queries are never searched (enrich_one stops
+    at queries[:3]), and only the first query is sent for every SKU, so
+    warming it never adds DDG traffic. SKUs sharing a name (e.g. sizes) then
+    hit the cache instead of racing each other to DDG.
+    """
+    distinct = {}
+    for row in rows:
+        brand = title_case_brand(str(row.get("Brand", "")).strip())
+        sku_name = normalize_name(str(row.get("SKU Name", "")).strip())
+        queries = build_queries(brand, sku_name, category="")
+        if queries:
+            distinct.setdefault(queries[0], None)
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        list(tqdm(
+            pool.map(lambda q: ddg_search(q, max_results=SEARCH_RESULTS, cache=cache), distinct),
+            total=len(distinct), desc="Searching",
+        ))
+
+def enrich_one(row: Dict, cache: WebCache, max_urls: int = MAX_URLS_PER_SKU,
+               parse_pool: Optional[Executor] = None) -> Dict:
     sku_id = str(row.get("SKU ID", "")).strip()
     brand_raw = str(row.get("Brand", "")).strip()
     sku_name_raw = str(row.get("SKU Name", "")).strip()
@@ -450,7 +672,7 @@ def enrich_one(row: Dict, cache: WebCache, max_urls: int = MAX_URLS_PER_SKU) ->
     # Search -> URLs
     urls = []
     for q in queries[:3]:  # keep it fast
-        results = ddg_search(q, max_results=6, cache=cache)
+        results = ddg_search(q, max_results=SEARCH_RESULTS, cache=cache)
         for r in results:
             u = r.get("url", "")
             if not u or not u.startswith("http"):
@@ -468,7 +690,7 @@ def enrich_one(row: Dict, cache: WebCache, max_urls: int = MAX_URLS_PER_SKU) ->
     # Fetch docs
     docs: List[WebDoc] = []
     for u in urls:
-        d = fetch_and_extract(u, cache=cache)
+        d = fetch_and_extract(u, cache=cache, parse_pool=parse_pool)
         if d and d.text and len(d.text) > 120:
             docs.append(d)
 
@@ -477,10 +699,7 @@ def enrich_one(row: Dict, cache: WebCache, max_urls: int = MAX_URLS_PER_SKU) ->
     merged_text = " ".join([d.text for d in best_docs])
     merged_text = merged_text[:MAX_FETCH_CHARS]
 
-    ingredients = extract_ingredients(merged_text)
-    allergens = extract_allergens(merged_text)
-
-    abv = extract_abv(merged_text) if alcohol else None
+    ingredients, allergens, abv = extract_facts(merged_text, alcohol)
 
     description = generate_description(
         category=category,
@@ -488,7 +707,8 @@ def enrich_one(row: Dict, cache: WebCache, max_urls: int = MAX_URLS_PER_SKU) ->
         brand=brand,
         size=size,
         tags=tags,
-        abv=abv
+        abv=abv,
+        sku_id=sku_id
     )
 
     precautions = generate_precautions(category=category, allergens=allergens, alcohol=alcohol)
@@ -533,9 +753,10 @@ def main():
     ap.add_argument("--out_ndjson", default="products_enriched.ndjson", help="Output NDJSON (one per line)")
     ap.add_argument("--limit", type=int, default=0, help="Optional limit for testing; 0 = all")
     ap.add_argument("--max_urls", type=int, default=MAX_URLS_PER_SKU)
+    ap.add_argument("--force", action="store_true", help="Re-enrich every SKU, ignoring previous output")
     args = ap.parse_args()
 
-    df = pd.read_excel(args.input)
+    df = read_excel_cached(args.input)
     if args.limit and args.limit > 0:
         df = df.head(args.limit)
 
@@ -543,20 +764,57 @@ def main():
 
     enriched_by_sku: Dict[str, Dict] = {}
 
-    # Sequential is safest for the web (less blocks). It will take time, but won't explode.
-    # If you want faster later, we can add ThreadPoolExecutor with conservative rate limit per worker.
-    with open(args.out_ndjson, "w", encoding="utf-8") as fnd:
-        for _, r in tqdm(df.iterrows(), total=len(df), desc="Enriching"):
-            row = r.to_dict()
-            sku = str(row.get("SKU ID", "")).strip()
-            item = enrich_one(row, cache=cache, max_urls=args.max_urls)
-            enriched_by_sku[sku] = item
-            fnd.write(json.dumps(item, ensure_ascii=False) + "\n")
+    # Generation is deterministic, so a row whose input is unchanged since the
+    # previous run can reuse that run's item instead of being enriched again.
+    previous: Dict[str, Dict] = {}
+    if not args.force and os.path.exists(args.out_json):
+        with open(args.out_json, "rb") as f:
+            previous = orjson.loads(f.read())
 
-    with open(args.out_json, "w", encoding="utf-8") as f:
-        json.dump(enriched_by_sku, f, ensure_ascii=False, indent=2)
-
-    print(f"\nDone. Wrote:\n - {args.out_json}\n - {args.out_ndjson}\nCache folder: cache/")
+    def reusable(row: Dict) -> Optional[Dict]:
+        old = previous.get(str(row.get("SKU ID", "")).strip())
+        if old is None or old.get("_hash") != input_hash(row):
+            return None
+        # no sources = search/fetch failed last time (possibly transient): retry
+        if not old.get("i18n", {}).get("en", {}).get("sources"):
+            return None
+        return old
+
+    rows = df.to_dict("records")
+    prewarm_searches([r for r in rows if reusable(r) is None], cache)
+
+    # SKUs are enriched on a thread pool so network waits overlap; host_slot()
+    # keeps it polite (at most PER_HOST_LIMIT requests in flight per site).
+    # pool.map yields in input order, so output order matches the sheet.
+    # HTML parsing runs in a process pool so it is not serialized by the GIL.
+    # "spawn": workers start clean instead of forking a threaded parent that
+    # holds an open SQLite connection.
+    spawn = multiprocessing.get_context("spawn")
+    # NDJSON goes to a temp file and is only published once complete, so a
+    # crashed run never leaves a partial stream for the merge to pick up
+    ndjson_tmp = f"{args.out_ndjson}.tmp"
+    with open(ndjson_tmp, "wb", buffering=1 << 20) as fnd, \
+            ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=spawn) as parse_pool, \
+            ThreadPoolExecutor(max_workers=WORKERS) as pool:
+
+        def enrich_or_reuse(row: Dict) -> Dict:
+            item = reusable(row)
+            if item is None:
+                item = enrich_one(row, cache=cache, max_urls=args.max_urls, parse_pool=parse_pool)
+                item["_hash"] = input_hash(row)
+            return item
+
+        items = pool.map(enrich_or_reuse, rows)
+        for item in tqdm(items, total=len(df), desc="Enriching"):
+            enriched_by_sku[item["sku"]] = item
+            fnd.write(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE))
+
+    # compact on purpose: this file is machine input for merge_enriched_into_content.py
+    with open(args.out_json, "wb") as f:
+        f.write(orjson.dumps(enriched_by_sku))
+    os.replace(ndjson_tmp, args.out_ndjson)
+
+    print(f"\nDone. Wrote:\n - {args.out_json}\n - {args.out_ndjson}\nCache: cache/web.db")
 
 if __name__ == "__main__":
     main()
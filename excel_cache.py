@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+def read_excel_cached(path) -> pd.DataFrame:
+    """
+    pd.read_excel with a Parquet copy next to the workbook.
+
+    The copy is rebuilt whenever the .xlsx is newer; otherwise the sheet loads
+    from Parquet and skips XML parsing entirely. If the sheet can't be stored
+    as Parquet (pyarrow missing, mixed-type column), it is just read from Excel.
+    """
+    path = Path(path)
+    parquet = path.with_suffix(".parquet")
+
+    if parquet.exists() and parquet.stat().st_mtime >= path.stat().st_mtime:
+        # object columns come back with None for empty cells; read_excel gives
+        # NaN, and downstream str()/input_hash must see the same value
+        return pd.read_parquet(parquet).replace({None: np.nan})
+
+    df = pd.read_excel(path)
+    # temp file + replace: an interrupted write never leaves a truncated
+    # copy that looks newer than the workbook
+    tmp = parquet.with_name(parquet.name + ".tmp")
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, parquet)
+    except (ImportError, ValueError, TypeError):
+        tmp.unlink(missing_ok=True)
+    return df
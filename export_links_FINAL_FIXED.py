@@ -18,9 +18,9 @@ if os.path.exists(OUTPUT_FILE):
     os.remove(OUTPUT_FILE)
     print("Old file removed")
 
-wb = Workbook()
-ws = wb.active
-ws.title = "Products"
+# write_only: строки пишутся потоком, без хранения ячеек в памяти
+wb = Workbook(write_only=True)
+ws = wb.create_sheet("Products")
 
 # --- ЯВНЫЕ МАРКЕРЫ ---
 ws.append(["GENERATED_BY", "export_links_FINAL_FIXED.py"])
@@ -30,7 +30,8 @@ ws.append(["SKU", "PRODUCT_URL"])
 
 count = 0
 
-for product_dir in sorted(PRODUCTS_DIR.iterdir()):
+# scandir: is_dir() берётся из d_type, без stat() на каждую папку
+for product_dir in sorted(os.scandir(PRODUCTS_DIR), key=lambda e: e.name):
     if not product_dir.is_dir():
         continue
 
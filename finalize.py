@@ -0,0 +1,70 @@
+"""
+post_qc + premium_pass in one pass over content/: each file is read, fixed,
+enhanced and written (if needed) once instead of twice.
+"""
+import os
+import argparse
+
+import orjson
+
+from content_manifest import load_manifest, save_manifest, file_stamp, entry_stamp
+from post_qc import QC_RULES, apply_post_qc
+from premium_pass import PREMIUM_RULES, apply_premium
+
+CONTENT_DIR = "content"
+MANIFEST_FILE = "finalize_manifest.json"
+RULES = f"{QC_RULES}:{PREMIUM_RULES}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--force", action="store_true", help="Re-check every file, ignoring the manifest")
+    args = ap.parse_args()
+
+    fixed_sources = 0
+    fixed_water = 0
+    enhanced = 0
+    files = 0
+    unchanged = 0
+
+    manifest = load_manifest(MANIFEST_FILE, RULES, force=args.force)
+
+    with os.scandir(CONTENT_DIR) as it:
+        entries = [e for e in it if e.name.endswith(".json")]
+
+    for entry in entries:
+        if manifest.get(entry.name) == entry_stamp(entry):
+            unchanged += 1
+            continue
+
+        with open(entry.path, "rb") as f:
+            data = orjson.loads(f.read())
+
+        files += 1
+
+        # same order as running post_qc.py, then premium_pass.py
+        sources_cleaned, water_fixed = apply_post_qc(data)
+        did_premium = apply_premium(data)
+
+        fixed_sources += sources_cleaned
+        fixed_water += water_fixed
+        enhanced += did_premium
+
+        if sources_cleaned or water_fixed or did_premium:
+            with open(entry.path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+        manifest[entry.name] = file_stamp(entry.path)
+
+    save_manifest(MANIFEST_FILE, manifest, RULES)
+
+    print("✅ FINALIZE completed")
+    print("Files processed:", files)
+    print("Unchanged since last run:", unchanged)
+    print("Sources cleaned:", fixed_sources)
+    print("Water descriptions fixed:", fixed_water)
+    print("Enhanced products:", enhanced)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import json
 import re
-import pandas as pd
+import orjson
+from copy import deepcopy
 from pathlib import Path
 
 from content_generators import generate_en_content
+from excel_cache import read_excel_cached
 from i18n_translator import generate_i18n_from_en
 
 
@@ -20,6 +22,15 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 # ==============================
 # HELPERS
 # ==============================
+def make_product() -> dict:
+    """
+    Fresh product from the template. Top-level values are scalars (tags is
+    replaced per row), so only the EN seed needs a deep copy; the other
+    template languages are regenerated from EN anyway.
+    """
+    return dict(template, i18n={"en": deepcopy(template_en)})
+
+
 def safe_filename(value: str) -> str:
     """
     Make filename safe for Windows / GitHub / URLs
@@ -42,7 +53,8 @@ def safe_filename(value: str) -> str:
 # LOAD DATA
 # ==============================
 template = json.loads(TEMPLATE_FILE.read_text(encoding="utf-8"))
-df = pd.read_excel(EXCEL_FILE)
+template_en = template["i18n"].get("en", {})
+df = read_excel_cached(EXCEL_FILE)
 
 created = 0
 
@@ -50,7 +62,8 @@ created = 0
 # ==============================
 # MAIN LOOP
 # ==============================
-for _, row in df.iterrows():
+# plain dicts per row: no per-row Series construction as with iterrows()
+for row in df.to_dict("records"):
     sku_raw = str(row.get("SKU ID", "")).strip()
     if not sku_raw:
         continue
@@ -58,8 +71,8 @@ for _, row in df.iterrows():
     # --- SAFE SKU (for filenames & paths) ---
     sku = safe_filename(sku_raw)
 
-    # --- deep copy template ---
-    product = json.loads(json.dumps(template))
+    # --- fresh copy of template ---
+    product = make_product()
 
     # --- BASIC FIELDS ---
     product["sku"] = sku
@@ -74,11 +87,6 @@ for _, row in df.iterrows():
     tags = str(row.get("Tags", "")).strip()
     product["tags"] = [t.strip() for t in tags.split(",") if t.strip()]
 
-    # ==============================
-    # RESET I18N (EN = SOURCE OF TRUTH)
-    # ==============================
-    product["i18n"] = {"en": product["i18n"].get("en", {})}
-
     # ==============================
     # 1️⃣ GENERATE EN CONTENT
     # ==============================
@@ -98,9 +106,9 @@ for _, row in df.iterrows():
     out_file = OUTPUT_DIR / f"{sku}.json"
     out_file.parent.mkdir(parents=True, exist_ok=True)
 
-    out_file.write_text(
-        json.dumps(product, ensure_ascii=False, indent=2),
-        encoding="utf-8"
+    # default=dict: shared section titles are read-only mappings
+    out_file.write_bytes(
+        orjson.dumps(product, option=orjson.OPT_INDENT_2, default=dict)
     )
 
     created += 1
@@ -1,9 +1,13 @@
-import json
+import re
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from itertools import islice
 from pathlib import Path
 
 
 
-TEMPLATE = Path("template.html").read_text(encoding="utf-8")
+TEMPLATE_FILE = Path("template.html")
 CONTENT_DIR = Path("content")
 PRODUCTS_DIR = Path("products")
 
@@ -18,14 +22,25 @@ LANG_MAP = {
     "hu": "hu.html"
 }
 
-PRODUCTS_DIR.mkdir(exist_ok=True)
+READ_WORKERS = 32
+READ_BATCH = 256  # products parsed ahead of the writer, at most
 
-for json_file in CONTENT_DIR.glob("*.json"):
-    data = json.loads(json_file.read_text(encoding="utf-8"))
+# {{NAME}} placeholders; the (utf-8) template is scanned once per page
+PLACEHOLDER_RE = re.compile(rb"\{\{(\w+)\}\}")
 
+
+def load_product(json_file):
+    return orjson.loads(json_file.read_bytes())
+
+
+def write_product_pages(data, template):
+    """
+    Render every language page of one product. `template` is the raw utf-8
+    bytes of template.html.
+    """
     sku = str(data.get("sku", "")).strip()
     if not sku:
-        continue
+        return
 
     # ---------- PRODUCT NAME (НЕ ПЕРЕВОДИМ) ----------
     product_name = (
@@ -40,18 +55,18 @@ for json_file in CONTENT_DIR.glob("*.json"):
     product_dir = PRODUCTS_DIR / sku
     product_dir.mkdir(parents=True, exist_ok=True)
 
+    # ---------- TAGS (одинаковые для всех языков) ----------
+    tags_html = "".join(
+        f'<span class="tag">{escape(tag)}</span>' for tag in data.get("tags", [])
+    ).encode("utf-8")
+
     for lang, filename in LANG_MAP.items():
         i18n = data["i18n"].get(lang, {})
         sections = i18n.get("sections", {})
         meta = i18n.get("meta", {})
 
-        # ---------- TAGS ----------
-        tags_html = ""
-        for tag in data.get("tags", []):
-            tags_html += f'<span class="tag">{tag}</span>'
-
         # ---------- HISTORY ----------
-        history_html = ""
+        history_parts = []
         history_labels = i18n.get("history_labels", {})
 
         for h in i18n.get("history", []):
@@ -62,46 +77,61 @@ for json_file in CONTENT_DIR.glob("*.json"):
             if not text:
                 continue
 
-            history_html += (
+            history_parts.append(
                 '<div class="history-item">'
-                + (f'<span class="year">{label}</span>' if label else "")
-                + f'<p>{text}</p>'
+                + (f'<span class="year">{escape(label)}</span>' if label else "")
+                + f'<p>{escape(text)}</p>'
                 + '</div>'
             )
 
-        # ---------- LABELS ----------
-        brand_label = meta.get("brand", "")
-        country_label = meta.get("country_of_origin", "")
-        category_label = meta.get("category", "")
-        size_label = meta.get("size", "")
-        alcohol_label = meta.get("alcohol_content", "")
-
         # ---------- BUILD HTML ----------
-        html = (
-            TEMPLATE
-            .replace("{{TITLE}}", product_name)
-            .replace("{{TAGS}}", tags_html)
-            .replace("{{BRAND_LABEL}}", brand_label)
-            .replace("{{COUNTRY_LABEL}}", country_label)
-            .replace("{{CATEGORY_LABEL}}", category_label)
-            .replace("{{SIZE_LABEL}}", size_label)
-            .replace("{{ALCOHOL_LABEL}}", alcohol_label)
-            .replace("{{BRAND}}", data.get("brand", ""))
-            .replace("{{COUNTRY}}", data.get("country_of_origin", ""))
-            .replace("{{CATEGORY}}", data.get("category", ""))
-            .replace("{{SIZE}}", data.get("size", ""))
-            .replace("{{ALCOHOL}}", data.get("alcohol_content", ""))
-            .replace("{{SKU}}", sku)
-            .replace("{{DESC_TITLE}}", sections.get("description_title", ""))
-            .replace("{{ING_TITLE}}", sections.get("ingredients_title", ""))
-            .replace("{{PREC_TITLE}}", sections.get("precautions_title", ""))
-            .replace("{{HISTORY_TITLE}}", sections.get("history_title", ""))
-            .replace("{{DESCRIPTION}}", i18n.get("description", ""))
-            .replace("{{INGREDIENTS}}", i18n.get("ingredients", ""))
-            .replace("{{PRECAUTIONS}}", i18n.get("precautions", ""))
-            .replace("{{HISTORY_ITEMS}}", history_html)
-        )
-
-        (product_dir / filename).write_text(html, encoding="utf-8")
-
-print("✅ Pages generated")
+        text_values = {
+            "TITLE": product_name,
+            "BRAND_LABEL": meta.get("brand", ""),
+            "COUNTRY_LABEL": meta.get("country_of_origin", ""),
+            "CATEGORY_LABEL": meta.get("category", ""),
+            "SIZE_LABEL": meta.get("size", ""),
+            "ALCOHOL_LABEL": meta.get("alcohol_content", ""),
+            "BRAND": data.get("brand", ""),
+            "COUNTRY": data.get("country_of_origin", ""),
+            "CATEGORY": data.get("category", ""),
+            "SIZE": data.get("size", ""),
+            "ALCOHOL": data.get("alcohol_content", ""),
+            "SKU": sku,
+            "DESC_TITLE": sections.get("description_title", ""),
+            "ING_TITLE": sections.get("ingredients_title", ""),
+            "PREC_TITLE": sections.get("precautions_title", ""),
+            "HISTORY_TITLE": sections.get("history_title", ""),
+            "DESCRIPTION": i18n.get("description", ""),
+            "INGREDIENTS": i18n.get("ingredients", ""),
+            "PRECAUTIONS": i18n.get("precautions", ""),
+        }
+        # plain text is HTML-escaped; TAGS / HISTORY_ITEMS are markup built above
+        values = {k.encode(): escape(v).encode("utf-8") for k, v in text_values.items()}
+        values[b"TAGS"] = tags_html
+        values[b"HISTORY_ITEMS"] = "".join(history_parts).encode("utf-8")
+
+        # unknown placeholders are left as they are
+        html = PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), template)
+
+        (product_dir / filename).write_bytes(html)
+
+def main():
+    # шаблон читаем при каждом запуске — main() вызывается из app.py без рестарта
+    template = TEMPLATE_FILE.read_bytes()
+    PRODUCTS_DIR.mkdir(exist_ok=True)
+
+    # чтение файлов параллельно: много мелких read() в полёте одновременно.
+    # Пачками: map() сразу ставит в очередь весь вход, и без пачек в памяти
+    # оказался бы почти весь каталог.
+    files = CONTENT_DIR.glob("*.json")
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as read_pool:
+        while batch := list(islice(files, READ_BATCH)):
+            for data in read_pool.map(load_product, batch):
+                write_product_pages(data, template)
+
+    print("✅ Pages generated")
+
+
+if __name__ == "__main__":
+    main()
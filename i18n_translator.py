@@ -1,8 +1,16 @@
-import i18n_translator
-print("i18n_translator loaded from:", i18n_translator.__file__)
-from copy import deepcopy
+"""
+EN -> остальные языки (шаблонами, без машинного перевода).
 
-LANGS = ["ru", "ua", "de", "es", "it", "hr", "hu"]
+Блоки всех языков и всех товаров делят одни и те же объекты "sections" и
+"meta" (read-only MappingProxyType). Их нельзя менять на месте: нужно
+другое значение — присвойте новый dict. При сериализации через orjson
+нужен default=dict.
+"""
+from types import MappingProxyType
+
+from content_generators import compile_template
+
+LANGS = ("ru", "ua", "de", "es", "it", "hr", "hu")
 
 SECTION_TITLES = {
     "ru": {"description_title":"Описание","ingredients_title":"Ингредиенты","precautions_title":"Предостережения","history_title":"История"},
@@ -93,6 +101,29 @@ HIST_TPL = {
     ],
 }
 
+# таблицы только для чтения: случайная запись в них падает, а не портит все товары
+SECTION_TITLES = MappingProxyType({lang: MappingProxyType(d) for lang, d in SECTION_TITLES.items()})
+META_LABELS = MappingProxyType({lang: MappingProxyType(d) for lang, d in META_LABELS.items()})
+DESC_TPL = MappingProxyType(DESC_TPL)
+ING_TEXT = MappingProxyType(ING_TEXT)
+PREC_TEXT = MappingProxyType(PREC_TEXT)
+HIST_TPL = MappingProxyType({lang: tuple(tpls) for lang, tpls in HIST_TPL.items()})
+
+# шаблоны разбираем один раз при импорте, в цикле только склейка строк
+# позиционные аргументы: desc_fn(name, brand, country, size), hist_fn(brand, country)
+DESC_ARGS = ("name", "brand", "country", "size")
+HIST_ARGS = ("brand", "country")
+DESC_FN = MappingProxyType({lang: compile_template(t, DESC_ARGS) for lang, t in DESC_TPL.items()})
+HIST_FN = MappingProxyType({
+    lang: tuple(compile_template(t, HIST_ARGS) for t in tpls) for lang, tpls in HIST_TPL.items()
+})
+
+# всё, что нужно одному языку, одним кортежем: один поиск на язык вместо шести
+LANG_BUNDLE = MappingProxyType({
+    lang: (SECTION_TITLES[lang], META_LABELS[lang], DESC_FN[lang], ING_TEXT[lang], PREC_TEXT[lang], HIST_FN[lang])
+    for lang in LANGS
+})
+
 def generate_i18n_from_en(data: dict):
     en = data["i18n"]["en"]
 
@@ -102,33 +133,35 @@ def generate_i18n_from_en(data: dict):
     size = (data.get("size") or "").strip()
 
     # EN остаётся как есть (его генерирует content_generators)
-    for lang in LANGS:
-        block = deepcopy(en)
+    years = [h.get("year", "") for h in en.get("history", [])]
+    n_years = len(years)
+
+    for lang, (sections, meta, desc_fn, ing, prec, hist_fns) in LANG_BUNDLE.items():
+        # shallow copy: every localized field is reassigned below (in place,
+        # so keys keep EN's order); EN-only extras are shared by reference
+        block = dict(en)
 
         # labels
-        block["sections"] = SECTION_TITLES[lang]
-        block["meta"] = META_LABELS[lang]
+        block["sections"] = sections
+        block["meta"] = meta
 
         # title: оставляем товарное название, НЕ переводим
         block["title"] = name
 
         # description: делаем локализованный шаблон (без английского)
-        block["description"] = DESC_TPL[lang].format(
-            name=name, brand=brand, country=country, size=size
-        )
+        block["description"] = desc_fn(name, brand, country, size)
 
         # ingredients/precautions: локализованные заглушки
-        block["ingredients"] = ING_TEXT[lang]
-        block["precautions"] = PREC_TEXT[lang]
+        block["ingredients"] = ing
+        block["precautions"] = prec
 
         # history: локализованный шаблон + сохраняем годы из EN
-        history_out = []
-        years = [h.get("year", "") for h in en.get("history", [])]
-        for i, tpl in enumerate(HIST_TPL[lang]):
-            history_out.append({
-                "year": years[i] if i < len(years) else "",
-                "text": tpl.format(brand=brand, country=country)
-            })
+        history_out = [None] * len(hist_fns)
+        for i, fmt in enumerate(hist_fns):
+            history_out[i] = {
+                "year": years[i] if i < n_years else "",
+                "text": fmt(brand, country)
+            }
         block["history"] = history_out
 
         data["i18n"][lang] = block
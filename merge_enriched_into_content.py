@@ -1,54 +1,93 @@
-import json
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import orjson
 
 CONTENT_DIR = "content"
 ENRICHED_FILE = "products_enriched.json"
+ENRICHED_NDJSON = "products_enriched.ndjson"  # same items, one per line
+WORKERS = min(32, (os.cpu_count() or 1) * 4)
+BATCH_SIZE = 512
 
-FIELDS_TO_MERGE = [
+FIELDS_TO_MERGE = (
     "description",
     "ingredients",
     "precautions",
     "history",
-    "sources"
-]
+    "sources",
+)
 
 # ---------- load enriched ----------
-with open(ENRICHED_FILE, encoding="utf-8") as f:
-    enriched = json.load(f)
-
-updated = 0
-skipped = 0
+def iter_enriched():
+    """
+    (sku, item) pairs. Streams the NDJSON written by enrich_products.py when
+    there is one (it is published only after a complete run, together with the
+    JSON dict), so only one item is parsed at a time.
+    """
+    if os.path.exists(ENRICHED_NDJSON):
+        with open(ENRICHED_NDJSON, "rb") as f:
+            for line in f:
+                if line.strip():
+                    item = orjson.loads(line)
+                    yield item.get("sku", ""), item
+    else:
+        with open(ENRICHED_FILE, "rb") as f:
+            yield from orjson.loads(f.read()).items()
 
-for fname in os.listdir(CONTENT_DIR):
-    if not fname.endswith(".json"):
-        continue
 
-    sku = fname.replace(".json", "")
-    path = os.path.join(CONTENT_DIR, fname)
+def process(item) -> str:
+    """
+    Merge one enriched SKU into content/<sku>.json; returns "updated",
+    "nochange" or "skipped" (no content file for it).
+    """
+    sku, enr = item
+    path = os.path.join(CONTENT_DIR, f"{sku}.json")
 
-    if sku not in enriched:
-        skipped += 1
-        continue
-
-    with open(path, encoding="utf-8") as f:
-        product = json.load(f)
+    try:
+        with open(path, "rb") as f:
+            product = orjson.loads(f.read())
+    except FileNotFoundError:
+        return "skipped"
 
     en_old = product.setdefault("i18n", {}).setdefault("en", {})
-    en_new = enriched[sku].get("i18n", {}).get("en", {})
+    en_new = enr.get("i18n", {}).get("en", {})
 
     changed = False
+    get_new = en_new.get
+    get_old = en_old.get
 
     for field in FIELDS_TO_MERGE:
-        if field in en_new and en_new[field]:
-            if en_old.get(field) != en_new[field]:
-                en_old[field] = en_new[field]
-                changed = True
+        value = get_new(field)
+        if value and get_old(field) != value:
+            en_old[field] = value
+            changed = True
+
+    if not changed:
+        return "nochange"
+
+    # full rewrite, but atomic: the editor and the QC passes may read it meanwhile
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(product, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, path)
+    return "updated"
+
+
+# ---------- merge (I/O-bound: a thread pool overlaps the reads/writes) ----------
+# walk the enriched SKUs, not content/: SKUs that weren't enriched are never opened.
+# Fixed-size batches keep memory flat (pool.map would pull in the whole
+# stream up front); dict() per batch keeps the last item of a repeated SKU.
+results = Counter()
+items = iter_enriched()
+with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+    while batch := dict(islice(items, BATCH_SIZE)):
+        results.update(pool.map(process, batch.items()))
 
-    if changed:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(product, f, ensure_ascii=False, indent=2)
-        updated += 1
+updated = results["updated"]
+skipped = results["skipped"]
 
 print("MERGE completed")
 print("Updated SKUs:", updated)
-print("Skipped (not found in enriched):", skipped)
+print("Skipped (no content file):", skipped)
@@ -1,48 +1,74 @@
 import os
-import json
 import re
+import argparse
+from functools import lru_cache
 from urllib.parse import urlparse
 
+import orjson
+
+from content_manifest import load_manifest, save_manifest, file_stamp, entry_stamp, rules_fingerprint
+
 CONTENT_DIR = "content"
+MANIFEST_FILE = "qc_manifest.json"
 
 # -------- helpers --------
 
-def is_relevant_source(url: str, brand: str) -> bool:
+BAD_DOMAINS = (
+    "wikipedia.org",        # generic wiki noise
+    "facebook.com",
+    "instagram.com",
+    "twitter.com",
+    "pinterest.com",
+    "opentermsarchive.org",
+    "cbsox.com",            # пойманный мусор
+)
+# одна проверка регэкспом вместо цикла по подстрокам
+BAD_RE = re.compile("|".join(map(re.escape, BAD_DOMAINS)))
+
+# ритейлеры (разрешаем)
+RETAILERS = (
+    "amazon", "walmart", "publix", "metro",
+    "winndixie", "totalwine", "instacart",
+    "bakkal", "gastronom",
+)
+
+NONALNUM_RE = re.compile(r"[^a-z0-9]")
+
+
+@lru_cache(maxsize=None)
+def build_matcher(brand: str):
+    """
+    One search() per source: brand prefix (if any) or a known retailer.
+    Cached per brand: many products share one, so each is normalized and
+    compiled once per run.
+    """
+    brand_key = NONALNUM_RE.sub("", brand.lower())[:6]
+    alternatives = [re.escape(brand_key)] if brand_key else []
+    return re.compile("|".join(alternatives + [re.escape(r) for r in RETAILERS])).search
+
+
+def is_relevant_source(url: str, matcher) -> bool:
     if not url:
         return False
 
-    bad_domains = [
-        "wikipedia.org",        # generic wiki noise
-        "facebook.com",
-        "instagram.com",
-        "twitter.com",
-        "pinterest.com",
-        "opentermsarchive.org",
-        "cbsox.com"             # пойманный мусор
-    ]
-
     domain = urlparse(url).netloc.lower()
 
-    if any(bad in domain for bad in bad_domains):
+    if BAD_RE.search(domain):
         return False
 
-    brand_key = re.sub(r"[^a-z0-9]", "", brand.lower())
-    domain_key = re.sub(r"[^a-z0-9]", "", domain)
+    domain_key = NONALNUM_RE.sub("", domain)
 
-    # если бренд хоть как-то читается в домене — ок
-    if brand_key and brand_key[:6] in domain_key:
-        return True
+    # бренд хоть как-то читается в домене или это ритейлер — ок
+    return matcher(domain_key) is not None
 
-    # ритейлеры (разрешаем)
-    retailers = [
-        "amazon", "walmart", "publix", "metro",
-        "winndixie", "totalwine", "instacart",
-        "bakkal", "gastronom"
-    ]
-    if any(r in domain_key for r in retailers):
-        return True
 
-    return False
+STILL_TRIGGERS = ("NON-CARBONATED", "STILL", "BLUE")
+SPARK_TRIGGERS = ("SPARKLING", "CARBONATED", "GREEN")
+SPARKLING_RE = re.compile(r"\bsparkling\b", re.IGNORECASE)
+STILL_RE = re.compile(r"\bstill\b", re.IGNORECASE)
+
+# правила QC: если поменялись — весь content/ проверяется заново
+QC_RULES = rules_fingerprint(BAD_DOMAINS, RETAILERS, STILL_TRIGGERS, SPARK_TRIGGERS)
 
 
 def fix_water_description(desc: str, title: str) -> str:
@@ -51,33 +77,28 @@ def fix_water_description(desc: str, title: str) -> str:
     """
     t = (title or "").upper()
 
-    # явные маркеры
-    if any(k in t for k in ["NON-CARBONATED", "STILL", "BLUE"]):
-        desc = re.sub(r"\bsparkling\b", "still", desc, flags=re.IGNORECASE)
+    # явные маркеры (подстроки: "NON-CARBONATED" срабатывает на обе группы)
+    to_still = any(k in t for k in STILL_TRIGGERS)
+    to_spark = any(k in t for k in SPARK_TRIGGERS)
+    if not (to_still or to_spark):
+        return desc
 
-    if any(k in t for k in ["SPARKLING", "CARBONATED", "GREEN"]):
-        desc = re.sub(r"\bstill\b", "sparkling", desc, flags=re.IGNORECASE)
+    if to_still:
+        desc = SPARKLING_RE.sub("still", desc)
 
-    return desc
+    if to_spark:
+        desc = STILL_RE.sub("sparkling", desc)
 
+    return desc
 
-# -------- main --------
-
-fixed_sources = 0
-fixed_water = 0
-files = 0
-
-for fname in os.listdir(CONTENT_DIR):
-    if not fname.endswith(".json"):
-        continue
-
-    path = os.path.join(CONTENT_DIR, fname)
-
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
 
-    changed = False
-    files += 1
+def apply_post_qc(data: dict):
+    """
+    Clean EN sources and fix the water description in place.
+    Returns (sources_cleaned, water_fixed).
+    """
+    sources_cleaned = False
+    water_fixed = False
 
     brand = data.get("brand", "")
     cat = data.get("category", "")
@@ -87,15 +108,11 @@ for fname in os.listdir(CONTENT_DIR):
     # ---- SOURCES CLEAN ----
     sources = en.get("sources", [])
     if sources:
-        clean = []
-        for s in sources:
-            url = s.get("url", "")
-            if is_relevant_source(url, brand):
-                clean.append(s)
+        matcher = build_matcher(brand or "")
+        clean = [s for s in sources if is_relevant_source(s.get("url", ""), matcher)]
 
         if len(clean) != len(sources):
-            fixed_sources += 1
-            changed = True
+            sources_cleaned = True
 
         if not clean:
             clean = [{
@@ -113,14 +130,60 @@ for fname in os.listdir(CONTENT_DIR):
 
         if new_desc != desc:
             en["description"] = new_desc
-            fixed_water += 1
-            changed = True
+            water_fixed = True
+
+    return sources_cleaned, water_fixed
+
+
+# -------- main --------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--force", action="store_true", help="Re-check every file, ignoring the manifest")
+    args = ap.parse_args()
+
+    fixed_sources = 0
+    fixed_water = 0
+    files = 0
+    unchanged = 0
+
+    # файлы, не менявшиеся с прошлого прогона, уже прошли QC — не открываем их
+    manifest = load_manifest(MANIFEST_FILE, QC_RULES, force=args.force)
+
+    with os.scandir(CONTENT_DIR) as it:
+        entries = [e for e in it if e.name.endswith(".json")]
+
+    for entry in entries:
+        fname = entry.name
+        path = entry.path
+
+        if manifest.get(fname) == entry_stamp(entry):
+            unchanged += 1
+            continue
+
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+
+        files += 1
+
+        sources_cleaned, water_fixed = apply_post_qc(data)
+        fixed_sources += sources_cleaned
+        fixed_water += water_fixed
+
+        if sources_cleaned or water_fixed:
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+        manifest[fname] = file_stamp(path)
+
+    save_manifest(MANIFEST_FILE, manifest, QC_RULES)
+
+    print("Post-QC done")
+    print("Files processed:", files)
+    print("Unchanged since last run:", unchanged)
+    print("Sources cleaned:", fixed_sources)
+    print("Water descriptions fixed:", fixed_water)
 
-    if changed:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
 
-print("Post-QC done")
-print("Files processed:", files)
-print("Sources cleaned:", fixed_sources)
-print("Water descriptions fixed:", fixed_water)
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,26 @@
-import json
+import os
+import argparse
+from multiprocessing import Pool
 from pathlib import Path
 
+import orjson
+
+from content_manifest import load_manifest, save_manifest, file_stamp, entry_stamp, rules_fingerprint
+
 CONTENT_DIR = Path("content")
+MANIFEST_FILE = "premium_manifest.json"
+
+# below these the EN texts get a generic addition
+DESC_MIN_LEN = 180
+ING_MIN_LEN = 60
+HISTORY_MIN_ITEMS = 3
+PREMIUM_RULES = rules_fingerprint(DESC_MIN_LEN, ING_MIN_LEN, HISTORY_MIN_ITEMS)
 
 def enhance_description(desc, category):
     if not desc:
         return desc
 
-    if len(desc) > 180:
+    if len(desc) > DESC_MIN_LEN:
         return desc  # уже достаточно плотное
 
     additions = {
@@ -25,14 +38,14 @@ def enhance_ingredients(ing):
     if not ing:
         return ing
 
-    if len(ing) > 60:
+    if len(ing) > ING_MIN_LEN:
         return ing
 
     return ing.strip() + " Commonly used in traditional recipes and everyday cooking."
 
 
 def enhance_history(history, brand, category, country):
-    if not history or len(history) >= 3:
+    if not history or len(history) >= HISTORY_MIN_ITEMS:
         return history
 
     return [
@@ -51,13 +64,32 @@ def enhance_history(history, brand, category, country):
     ]
 
 
-updated = 0
+def needs_enhancement(desc, ing, hist) -> bool:
+    """
+    Length-only prefilter: True if any enhance_* above would add something.
+    """
+    return (
+        (bool(desc) and len(desc) <= DESC_MIN_LEN)
+        or (bool(ing) and len(ing) <= ING_MIN_LEN)
+        or (bool(hist) and len(hist) < HISTORY_MIN_ITEMS)
+    )
+
 
-for json_file in CONTENT_DIR.glob("*.json"):
-    data = json.loads(json_file.read_text(encoding="utf-8"))
+def apply_premium(data: dict) -> bool:
+    """
+    Add the premium EN texts in place; True if anything was changed.
+    """
     i18n = data.get("i18n", {}).get("en", {})
     if not i18n:
-        continue
+        return False
+
+    desc = i18n.get("description", "")
+    ing = i18n.get("ingredients", "")
+    hist = i18n.get("history", [])
+
+    # уже «премиальный» товар: ничего не трогаем и не перезаписываем
+    if not needs_enhancement(desc, ing, hist):
+        return False
 
     category = data.get("category", "")
     brand = data.get("brand", "the brand")
@@ -65,30 +97,80 @@ for json_file in CONTENT_DIR.glob("*.json"):
 
     changed = False
 
+    # enhance_* hand back the same object when there is nothing to add,
+    # so an identity check replaces comparing texts / history lists
+
     # --- Description ---
-    desc = i18n.get("description", "")
     new_desc = enhance_description(desc, category)
-    if new_desc != desc:
+    if new_desc is not desc:
         i18n["description"] = new_desc
         changed = True
 
     # --- Ingredients ---
-    ing = i18n.get("ingredients", "")
     new_ing = enhance_ingredients(ing)
-    if new_ing != ing:
+    if new_ing is not ing:
         i18n["ingredients"] = new_ing
         changed = True
 
     # --- History ---
-    hist = i18n.get("history", [])
     new_hist = enhance_history(hist, brand, category, country)
-    if new_hist != hist:
+    if new_hist is not hist:
         i18n["history"] = new_hist
         changed = True
 
+    return changed
+
+
+def process_one(path: str):
+    """
+    Enhance one content file; runs in a worker process.
+    Returns (file name, changed, new manifest stamp).
+    """
+    json_file = Path(path)
+    data = orjson.loads(json_file.read_bytes())
+
+    changed = apply_premium(data)
     if changed:
-        json_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-        updated += 1
+        json_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+    return json_file.name, changed, file_stamp(json_file)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--force", action="store_true", help="Re-check every file, ignoring the manifest")
+    args = ap.parse_args()
+
+    updated = 0
+    unchanged = 0
+
+    # already-enhanced files that nobody touched since are skipped unopened
+    # (this also keeps short texts from getting the same addition twice)
+    manifest = load_manifest(MANIFEST_FILE, PREMIUM_RULES, force=args.force)
+
+    paths = []
+    with os.scandir(CONTENT_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            if manifest.get(entry.name) == entry_stamp(entry):
+                unchanged += 1
+                continue
+            paths.append(entry.path)
+
+    # files are independent: parse/enhance/write on every core; the manifest
+    # is only touched here in the parent
+    with Pool(processes=os.cpu_count()) as pool:
+        for name, changed, stamp in pool.imap_unordered(process_one, paths, chunksize=32):
+            updated += changed
+            manifest[name] = stamp
+
+    save_manifest(MANIFEST_FILE, manifest, PREMIUM_RULES)
+
+    print("✅ PREMIUM PASS completed")
+    print("Enhanced products:", updated)
+    print("Unchanged since last run:", unchanged)
+
 
-print("✅ PREMIUM PASS completed")
-print("Enhanced products:", updated)
+if __name__ == "__main__":
+    main()